@@ -0,0 +1,327 @@
+"""Byte-level metadata stripping.
+
+These helpers rewrite the container structure of an image without touching
+the compressed pixel data, so they are lossless and skip the decode/encode
+round-trip entirely. Kept ranges are collected as memoryview slices and
+joined once, so the output is allocated at its exact size in a single copy.
+When there is nothing to drop the input buffer is returned as-is.
+"""
+
+_JPEG_SOI = b"\xff\xd8"
+_JPEG_SOS = 0xDA
+_JPEG_EOI = 0xD9
+_JPEG_COM = 0xFE
+_JPEG_APP0 = 0xE0
+_JPEG_APP14 = 0xEE
+_JPEG_APP15 = 0xEF
+# Markers without a length field: TEM and RST0-RST7.
+_JPEG_STANDALONE = {0x01, *range(0xD0, 0xD8)}
+# Frame headers SOF0-SOF15; C4 (DHT), C8 (JPG) and CC (DAC) are not frames.
+_JPEG_SOF = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# Pseudo-marker for the entropy-coded data that follows each SOS header.
+_JPEG_SCAN_DATA = -1
+
+
+def _jpeg_segments(buf: bytes):
+    """Yield ``(marker, start, end)`` for each JPEG segment up to EOI.
+
+    Each SOS header is followed by a ``_JPEG_SCAN_DATA`` range covering its
+    entropy-coded data, so segments between progressive scans are walked
+    too. Anything after EOI (MPF images, gain maps, vendor trailers) is
+    never yielded. Raises ValueError if the stream is malformed.
+    """
+    if not buf.startswith(_JPEG_SOI):
+        raise ValueError("Not a JPEG stream")
+
+    pos = 2
+    size = len(buf)
+    has_frame = False
+
+    while pos < size:
+        if buf[pos] != 0xFF:
+            raise ValueError(f"Expected JPEG marker at offset {pos}")
+        # Markers may be preceded by any number of 0xFF fill bytes.
+        while pos + 1 < size and buf[pos + 1] == 0xFF:
+            pos += 1
+        if pos + 1 >= size:
+            raise ValueError("Truncated JPEG marker")
+
+        marker = buf[pos + 1]
+        if marker in (_JPEG_SOS, _JPEG_EOI) and not has_frame:
+            raise ValueError("JPEG has no frame header before image data")
+        if marker == _JPEG_EOI:
+            yield marker, pos, pos + 2
+            return
+        if marker in _JPEG_STANDALONE:
+            yield marker, pos, pos + 2
+            pos += 2
+            continue
+
+        if pos + 4 > size:
+            raise ValueError("Truncated JPEG segment header")
+        length = int.from_bytes(buf[pos + 2:pos + 4], "big")
+        end = pos + 2 + length
+        if length < 2 or end > size:
+            raise ValueError(f"Invalid JPEG segment length at offset {pos}")
+        has_frame = has_frame or marker in _JPEG_SOF
+        yield marker, pos, end
+        pos = end
+
+        if marker == _JPEG_SOS:
+            # Skip the scan to the next real marker: 0xFF00 is a stuffed byte
+            # and RST0-RST7 belong to the scan.
+            scan = end
+            while True:
+                scan = buf.find(b"\xff", scan)
+                if scan < 0 or scan + 1 >= size:
+                    raise ValueError("Truncated JPEG scan data")
+                following = buf[scan + 1]
+                if following == 0xFF:
+                    scan += 1
+                elif following == 0x00 or 0xD0 <= following <= 0xD7:
+                    scan += 2
+                else:
+                    break
+            yield _JPEG_SCAN_DATA, end, scan
+            pos = scan
+
+    raise ValueError("JPEG stream ended without EOI")
+
+
+def strip_jpeg(buf: bytes) -> bytes:
+    """Drop APPn and COM segments from a JPEG, like ``jpegtran -copy none``.
+
+    The JFIF APP0 header is kept without its thumbnail, and the Adobe APP14
+    segment is kept because decoders need it to interpret CMYK/YCCK data.
+    Raises ValueError if the stream is malformed.
+    """
+    view = memoryview(buf)
+    parts = [_JPEG_SOI]
+    changed = False
+    end = 2
+
+    for marker, pos, end in _jpeg_segments(buf):
+        if marker == _JPEG_SCAN_DATA:
+            parts.append(view[pos:end])
+            continue
+        identifier = buf[pos + 4:pos + 9]
+        if marker == _JPEG_APP0 and identifier == b"JFIF\x00" and end - pos > 18:
+            # Keep version and density, drop the embedded thumbnail.
+            parts += (b"\xff\xe0\x00\x10", view[pos + 4:pos + 16], b"\x00\x00")
+            changed = True
+        elif (marker == _JPEG_APP0 and identifier == b"JFIF\x00") or (
+            marker == _JPEG_APP14 and identifier == b"Adobe"
+        ):
+            parts.append(view[pos:end])
+        elif _JPEG_APP0 <= marker <= _JPEG_APP15 or marker == _JPEG_COM:
+            changed = True
+        else:
+            parts.append(view[pos:end])
+
+    # Drop any trailer after EOI; it can hold whole images with their own EXIF.
+    changed = changed or end != len(buf)
+    return b"".join(parts) if changed else buf
+
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_PNG_METADATA_CHUNKS = {b"tEXt", b"zTXt", b"iTXt", b"eXIf", b"iCCP", b"tIME"}
+
+
+def _png_chunks(buf: bytes):
+    """Yield ``(chunk_type, start, end)`` for each PNG chunk up to IEND.
+
+    Raises ValueError if the stream is malformed.
+    """
+    if not buf.startswith(_PNG_SIGNATURE):
+        raise ValueError("Not a PNG stream")
+
+    pos = len(_PNG_SIGNATURE)
+    size = len(buf)
+
+    while pos < size:
+        if pos + 8 > size:
+            raise ValueError("Truncated PNG chunk header")
+        length = int.from_bytes(buf[pos:pos + 4], "big")
+        chunk_type = buf[pos + 4:pos + 8]
+        end = pos + 12 + length
+        if end > size:
+            raise ValueError(f"Invalid PNG chunk length at offset {pos}")
+        if pos == len(_PNG_SIGNATURE) and chunk_type != b"IHDR":
+            raise ValueError("PNG does not start with IHDR")
+        yield chunk_type, pos, end
+        if chunk_type == b"IEND":
+            return
+        pos = end
+
+    raise ValueError("PNG stream ended without IEND")
+
+
+def strip_png(buf: bytes) -> bytes:
+    """Drop text, EXIF, ICC and timestamp chunks from a PNG.
+
+    Kept chunks are copied verbatim, so their CRCs stay valid and the IDAT
+    stream is never inflated. Raises ValueError if the stream is malformed.
+    """
+    view = memoryview(buf)
+    parts = [_PNG_SIGNATURE]
+    changed = False
+
+    for chunk_type, pos, end in _png_chunks(buf):
+        if chunk_type in _PNG_METADATA_CHUNKS:
+            changed = True
+        else:
+            parts.append(view[pos:end])
+
+    # Drop any trailer after IEND; decoders ignore it, so it can hide anything.
+    changed = changed or end != len(buf)
+    return b"".join(parts) if changed else buf
+
+
+_WEBP_METADATA_CHUNKS = {b"EXIF", b"XMP ", b"ICCP"}
+_WEBP_IMAGE_CHUNKS = {b"VP8 ", b"VP8L", b"VP8X"}
+# VP8X feature flags announcing the chunks above.
+_WEBP_VP8X_METADATA_FLAGS = 0x20 | 0x08 | 0x04
+
+
+def _webp_chunks(buf: bytes):
+    """Yield ``(fourcc, start, end)`` for each chunk of a WebP RIFF container.
+
+    ``end`` includes the padding byte of odd-sized chunks.
+    Raises ValueError if the stream is malformed.
+    """
+    if len(buf) < 12 or buf[:4] != b"RIFF" or buf[8:12] != b"WEBP":
+        raise ValueError("Not a WebP stream")
+
+    pos = 12
+    size = min(len(buf), 8 + int.from_bytes(buf[4:8], "little"))
+    has_image = False
+
+    while pos < size:
+        if pos + 8 > size:
+            raise ValueError("Truncated WebP chunk header")
+        fourcc = buf[pos:pos + 4]
+        length = int.from_bytes(buf[pos + 4:pos + 8], "little")
+        # Chunk payloads are padded to an even size.
+        end = pos + 8 + length + (length & 1)
+        if end > size:
+            raise ValueError(f"Invalid WebP chunk length at offset {pos}")
+        has_image = has_image or fourcc in _WEBP_IMAGE_CHUNKS
+        yield fourcc, pos, end
+        pos = end
+
+    if not has_image:
+        raise ValueError("WebP has no VP8/VP8L/VP8X chunk")
+
+
+def strip_webp(buf: bytes) -> bytes:
+    """Drop EXIF, XMP and ICC chunks from a WebP RIFF container.
+
+    The VP8X feature flags and the RIFF size are updated to match.
+    Raises ValueError if the stream is malformed.
+    """
+    view = memoryview(buf)
+    parts = []
+    changed = False
+
+    for fourcc, pos, end in _webp_chunks(buf):
+        if fourcc == b"VP8X" and end - pos > 8 and buf[pos + 8] & _WEBP_VP8X_METADATA_FLAGS:
+            chunk = bytearray(buf[pos:end])
+            chunk[8] &= ~_WEBP_VP8X_METADATA_FLAGS & 0xFF
+            parts.append(chunk)
+            changed = True
+        elif fourcc in _WEBP_METADATA_CHUNKS:
+            changed = True
+        else:
+            parts.append(view[pos:end])
+
+    # Drop any trailer past the declared RIFF size.
+    changed = changed or 8 + int.from_bytes(buf[4:8], "little") != len(buf)
+    if not changed:
+        return buf
+
+    riff_size = 4 + sum(len(part) for part in parts)
+    return b"".join([b"RIFF", riff_size.to_bytes(4, "little"), b"WEBP", *parts])
+
+
+_EXIF_HEADER = b"Exif\x00\x00"
+_ORIENTATION_TAG = 0x0112
+
+
+def _find_exif(buf: bytes, fmt: str) -> memoryview | None:
+    """Return the TIFF payload of the image's EXIF block, if any."""
+    view = memoryview(buf)
+
+    if fmt == "JPEG":
+        for marker, pos, end in _jpeg_segments(buf):
+            if marker == _JPEG_SOS:
+                break
+            if marker == _JPEG_APP0 + 1 and buf[pos + 4:pos + 10] == _EXIF_HEADER:
+                return view[pos + 10:end]
+    elif fmt == "PNG":
+        for chunk_type, pos, end in _png_chunks(buf):
+            if chunk_type == b"eXIf":
+                return view[pos + 8:end - 4]
+            if chunk_type == b"IDAT":
+                break
+    elif fmt == "WEBP":
+        for fourcc, pos, end in _webp_chunks(buf):
+            if fourcc == b"EXIF":
+                payload = view[pos + 8:end]
+                # Some writers keep the JPEG-style prefix.
+                if payload[:6] == _EXIF_HEADER:
+                    payload = payload[6:]
+                return payload
+    return None
+
+
+def read_orientation(buf: bytes, fmt: str) -> int:
+    """Return the EXIF Orientation of ``buf``, or 1 if it has none.
+
+    Only the IFD0 entries are read, so this costs a few microseconds and
+    never decodes pixels. Unreadable EXIF and invalid values are treated
+    as upright.
+    """
+    try:
+        tiff = _find_exif(buf, fmt)
+    except ValueError:
+        return 1
+    if tiff is None or len(tiff) < 8:
+        return 1
+
+    if tiff[:2] == b"II":
+        order = "little"
+    elif tiff[:2] == b"MM":
+        order = "big"
+    else:
+        return 1
+
+    ifd = int.from_bytes(tiff[4:8], order)
+    if ifd + 2 > len(tiff):
+        return 1
+    count = int.from_bytes(tiff[ifd:ifd + 2], order)
+    for entry in range(ifd + 2, min(ifd + 2 + 12 * count, len(tiff) - 11), 12):
+        if int.from_bytes(tiff[entry:entry + 2], order) == _ORIENTATION_TAG:
+            # SHORT value, left-aligned in the 4-byte value field. Values
+            # outside 2-8 mean no transform, like ImageOps.exif_transpose.
+            value = int.from_bytes(tiff[entry + 8:entry + 10], order)
+            return value if 2 <= value <= 8 else 1
+    return 1
+
+
+def sniff_format(buf: bytes) -> str | None:
+    """Return the Pillow format name for ``buf`` from its magic bytes."""
+    if buf[:3] == b"\xff\xd8\xff":
+        return "JPEG"
+    if buf[:8] == _PNG_SIGNATURE:
+        return "PNG"
+    if buf[:4] == b"RIFF" and buf[8:12] == b"WEBP":
+        return "WEBP"
+    return None
+
+
+# Lossless strippers keyed by Pillow format name.
+FAST_STRIPPERS = {
+    "JPEG": strip_jpeg,
+    "PNG": strip_png,
+    "WEBP": strip_webp,
+}
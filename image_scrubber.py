@@ -1,14 +1,101 @@
 from pathlib import Path
+import io
 import tempfile
 import shutil
 import os
 import errno
+import logging
+import threading
 from enum import Enum
 from dataclasses import dataclass
 
-from PIL import Image, UnidentifiedImageError
+from PIL import Image, ImageOps, UnidentifiedImageError
 from PIL.PngImagePlugin import PngInfo
 
+from fast_strip import FAST_STRIPPERS, read_orientation, sniff_format
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    from turbojpeg import TurboJPEG, TJFLAG_PROGRESSIVE, TJPF_RGB, TJSAMP_420
+    _tj = TurboJPEG()
+except (ImportError, OSError, RuntimeError):
+    # PyTurboJPEG or the libjpeg-turbo shared library is missing;
+    # JPEG decode/encode falls back to Pillow.
+    _tj = None
+
+try:
+    import mozjpeg_lossless_optimization
+except ImportError:
+    mozjpeg_lossless_optimization = None
+
+# JPEG_BACKEND=mozjpeg losslessly recompresses every JPEG output with mozjpeg
+# (progressive scans, optimized Huffman tables): smaller files for more CPU.
+JPEG_BACKENDS = ("turbo", "mozjpeg")
+JPEG_BACKEND = os.environ.get("JPEG_BACKEND", "turbo").lower()
+if JPEG_BACKEND not in JPEG_BACKENDS:
+    raise ValueError(
+        f"Unknown JPEG_BACKEND {JPEG_BACKEND!r}; expected one of {', '.join(JPEG_BACKENDS)}"
+    )
+if JPEG_BACKEND == "mozjpeg" and mozjpeg_lossless_optimization is None:
+    logger.warning(
+        "JPEG_BACKEND=mozjpeg but mozjpeg-lossless-optimization is not installed; "
+        "JPEG output will not be recompressed"
+    )
+_mozjpeg = mozjpeg_lossless_optimization if JPEG_BACKEND == "mozjpeg" else None
+
+# Per-thread pixel buffer reused by libjpeg-turbo decodes. The limit fits a
+# 12 MP RGB photo; larger images get a fresh array that is freed afterwards.
+# Resident worst case is the limit times the scrub pool size per process.
+_tls = threading.local()
+_PIXEL_POOL_LIMIT = 36 * 1024 * 1024
+
+
+def _pooled_pixels(shape: tuple[int, int, int]) -> "np.ndarray | None":
+    """Return a C-contiguous view of this thread's pixel buffer, or None."""
+    size = shape[0] * shape[1] * shape[2]
+    if size > _PIXEL_POOL_LIMIT:
+        return None
+    pool = getattr(_tls, "pixels", None)
+    if pool is None or pool.size < size:
+        pool = _tls.pixels = np.empty(size, dtype=np.uint8)
+    return pool[:size].reshape(shape)
+
+
+# Array views matching ImageOps.exif_transpose for each EXIF Orientation value.
+_ORIENTATION_VIEWS = {
+    2: lambda a: a[:, ::-1],
+    3: lambda a: a[::-1, ::-1],
+    4: lambda a: a[::-1],
+    5: lambda a: a.transpose(1, 0, 2),
+    6: lambda a: a.transpose(1, 0, 2)[:, ::-1],
+    7: lambda a: a.transpose(1, 0, 2)[::-1, ::-1],
+    8: lambda a: a.transpose(1, 0, 2)[::-1],
+}
+
+
+def _reencode_jpeg_turbo(
+    data: bytes, quality: int, orientation: int = 1, optimize: bool = False
+) -> bytes:
+    """Decode and re-encode an RGB JPEG through libjpeg-turbo.
+
+    The encoder never writes APPn segments, so the output carries no metadata;
+    ``orientation`` is applied to the pixels before encoding. ``optimize``
+    emits a progressive JPEG, which libjpeg-turbo always Huffman-optimizes.
+    """
+    width, height, _, _ = _tj.decode_header(data)
+    pixels = _tj.decode(data, pixel_format=TJPF_RGB, dst=_pooled_pixels((height, width, 3)))
+    view = _ORIENTATION_VIEWS.get(orientation)
+    if view is not None:
+        pixels = view(pixels)
+    return _tj.encode(
+        pixels,
+        quality=quality,
+        pixel_format=TJPF_RGB,
+        jpeg_subsample=TJSAMP_420,
+        flags=TJFLAG_PROGRESSIVE if optimize else 0,
+    )
 
 
 class ResultType(Enum):
@@ -41,13 +128,20 @@ class ImageScrubber:
     """Scrubs metadata from image files."""
 
     SUPPORTED_FORMATS = {'.jpg', '.jpeg', '.png', '.webp'}
+    QUALITY = 95
+    METADATA_INFO_KEYS = ("exif", "icc_profile", "xmp", "comment")
 
     @classmethod
     def can_handle(cls, path: Path) -> bool:
         return path.suffix.lower() in cls.SUPPORTED_FORMATS
 
     @classmethod
-    def scrub(cls, input_path: Path, output_path: Path) -> ScrubResult:
+    def scrub(cls, input_path: Path, output_path: Path, optimize: bool = False) -> ScrubResult:
+        """Write a metadata-free copy of ``input_path`` to ``output_path``.
+
+        ``optimize`` trades encode time for size when pixels must be
+        re-encoded (extra Huffman pass for JPEG, full zlib search for PNG).
+        """
         # ---- input validation ----
         if not input_path.exists():
             return ScrubResult(
@@ -101,42 +195,44 @@ class ImageScrubber:
             ) as tmp:
                 tmp_path = Path(tmp.name)
 
-            # image processing
-            with Image.open(input_path) as img:
-                if not img.format:
-                    raise ValueError("Unknown image format")
-
-                fmt = img.format.upper()
-                save_kwargs = {}
-
-                # Remove metadata fields if present.
-                img.info.pop("exif", None)
-                img.info.pop("icc_profile", None)
-                img.info.pop("xmp", None)
-
-                if fmt == "JPEG":
-                    save_kwargs = {
-                        "format": "JPEG",
-                        "quality": 95,
-                        "exif": b"",
-                    }
-                elif fmt == "PNG":
-                    save_kwargs = {
-                        "format": "PNG",
-                        "pnginfo": PngInfo(),
-                        "optimize": False,
-                    }
-                elif fmt == "WEBP":
-                    save_kwargs = {
-                        "format": "WEBP",
-                        "quality": 95,
-                        "exif": b"",
-                    }
-                else:
-                    save_kwargs = {"format": fmt}
-
-                # Save directly from Pillow image object to avoid expensive Python-level pixel copies.
-                img.save(tmp_path, **save_kwargs)
+            # Read the input once: Pillow parses headers from an in-memory
+            # buffer and the fast paths work on the same bytes.
+            data = input_path.read_bytes()
+
+            # Trust the magic bytes, not the extension, and pin Pillow to that
+            # decoder so it skips probing every registered plugin.
+            fmt = sniff_format(data)
+            if fmt is None:
+                raise UnidentifiedImageError("Unrecognised image signature")
+
+            # Read Orientation straight from the bytes: upright images (the
+            # common case) can then skip both the decode and the transpose.
+            orientation = read_orientation(data, fmt)
+
+            stripper = FAST_STRIPPERS.get(fmt) if orientation == 1 else None
+
+            if stripper is not None:
+                # Nothing to rotate: metadata removal is pure byte rewriting,
+                # so the hot path never builds a Pillow image at all.
+                try:
+                    clean = stripper(data)
+                except ValueError as e:
+                    # Malformed container: report it like Pillow would.
+                    raise UnidentifiedImageError(str(e)) from e
+            else:
+                # image processing
+                with Image.open(io.BytesIO(data), formats=[fmt]) as img:
+                    if fmt == "JPEG" and _tj is not None and img.mode == "RGB":
+                        # libjpeg-turbo's SIMD codec beats Pillow's generic binding.
+                        clean = _reencode_jpeg_turbo(data, cls.QUALITY, orientation, optimize)
+                    else:
+                        clean = cls._save_clean(img, fmt, orientation, optimize)
+
+            if fmt == "JPEG" and _mozjpeg is not None:
+                clean = _mozjpeg.optimize(clean)
+
+            # Every path ends with the output in memory, so it hits disk exactly once.
+            tmp_path.write_bytes(clean)
 
             shutil.move(str(tmp_path), str(output_path))
             tmp_path = None
@@ -191,3 +287,46 @@ class ImageScrubber:
                     tmp_path.unlink()
                 except Exception:
                     pass
+
+    @classmethod
+    def _save_clean(
+        cls, img: Image.Image, fmt: str, orientation: int, optimize: bool
+    ) -> bytes:
+        """Re-encode ``img`` through Pillow without any metadata and return the bytes."""
+        if orientation != 1:
+            # The Orientation tag is about to be dropped, so apply it to the pixels.
+            img = ImageOps.exif_transpose(img)
+
+        # Remove metadata fields if present; Pillow re-emits these from img.info.
+        for key in cls.METADATA_INFO_KEYS:
+            img.info.pop(key, None)
+
+        if fmt == "JPEG":
+            save_kwargs = {
+                "format": "JPEG",
+                "quality": cls.QUALITY,
+                "exif": b"",
+                "optimize": optimize,
+                "progressive": optimize,
+            }
+        elif fmt == "PNG":
+            save_kwargs = {
+                "format": "PNG",
+                "pnginfo": PngInfo(),
+                "optimize": optimize,
+                # zlib level 1 is several times faster than the default 6.
+                "compress_level": 9 if optimize else 1,
+            }
+        elif fmt == "WEBP":
+            save_kwargs = {
+                "format": "WEBP",
+                "quality": cls.QUALITY,
+                "exif": b"",
+            }
+        else:
+            save_kwargs = {"format": fmt}
+
+        # Save directly from Pillow image object to avoid expensive Python-level pixel copies.
+        out = io.BytesIO()
+        img.save(out, **save_kwargs)
+        return out.getvalue()
@@ -1,7 +1,11 @@
+import errno
 import io
 import unittest
+import zipfile
+from unittest import mock
 
 from PIL import Image
+from werkzeug.datastructures import FileStorage
 
 from wrap import app
 
@@ -59,6 +63,116 @@ class ScrubberApiTests(unittest.TestCase):
         finally:
             response.close()
 
+    def test_scrub_rotated_jpeg_drops_comment_and_applies_orientation(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        buffer = io.BytesIO()
+        Image.new('RGB', (16, 8), color='navy').save(
+            buffer, format='JPEG', exif=exif, comment=b'secret comment'
+        )
+        buffer.seek(0)
+        response = self.client.post(
+            '/scrub',
+            data={'image': (buffer, 'rotated.jpg')},
+            content_type='multipart/form-data'
+        )
+        try:
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn(b'secret comment', response.data)
+            with Image.open(io.BytesIO(response.data)) as scrubbed:
+                self.assertEqual(scrubbed.size, (8, 16))
+                self.assertNotIn('exif', scrubbed.info)
+        finally:
+            response.close()
+
+    def test_scrub_optimize_param_emits_progressive_jpeg(self):
+        exif = Image.Exif()
+        exif[0x0112] = 3
+        buffer = io.BytesIO()
+        Image.new('RGB', (16, 16), color='navy').save(buffer, format='JPEG', exif=exif)
+        buffer.seek(0)
+        response = self.client.post(
+            '/scrub?optimize=1',
+            data={'image': (buffer, 'upside_down.jpg')},
+            content_type='multipart/form-data'
+        )
+        try:
+            self.assertEqual(response.status_code, 200)
+            with Image.open(io.BytesIO(response.data)) as scrubbed:
+                self.assertTrue(scrubbed.info.get('progressive'))
+        finally:
+            response.close()
+
+    def test_scrub_rejects_unsupported_content_behind_image_extension(self):
+        img = build_image_bytes('GIF')
+        response = self.client.post(
+            '/scrub',
+            data={'image': (img, 'disguised.jpg')},
+            content_type='multipart/form-data'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json().get('category'), 'input_error')
+
+    def test_scrub_batch_returns_zip_of_scrubbed_images(self):
+        response = self.client.post(
+            '/scrub_batch',
+            data={'image': [
+                (build_image_bytes('JPEG'), 'photo.jpg'),
+                (build_image_bytes('PNG'), 'photo.png'),
+                (build_image_bytes('JPEG'), 'photo.jpg'),
+                (build_image_bytes('JPEG'), '2_x.jpg'),
+                (build_image_bytes('JPEG'), 'x.jpg'),
+                (build_image_bytes('JPEG'), 'x.jpg'),
+            ]},
+            content_type='multipart/form-data'
+        )
+        try:
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.mimetype, 'application/zip')
+            with zipfile.ZipFile(io.BytesIO(response.data)) as archive:
+                names = archive.namelist()
+            self.assertEqual(len(names), 6)
+            self.assertEqual(len(set(names)), 6)
+            self.assertIn('scrubbed_photo.png', names)
+        finally:
+            response.close()
+
+    def test_scrub_batch_reports_failing_file(self):
+        response = self.client.post(
+            '/scrub_batch',
+            data={'image': [
+                (build_image_bytes('JPEG'), 'good.jpg'),
+                (io.BytesIO(b'not an image'), 'bad.jpg'),
+            ]},
+            content_type='multipart/form-data'
+        )
+        self.assertEqual(response.status_code, 400)
+        body = response.get_json()
+        self.assertEqual(body.get('category'), 'input_error')
+        self.assertEqual(body.get('file'), 'bad.jpg')
+
+    def test_scrub_rejects_jpeg_without_image_data(self):
+        for data in (b'\xff\xd8\xff\xd9', b'\xff\xd8\xff\xda\x00\x02garbage'):
+            with self.subTest(data=data):
+                response = self.client.post(
+                    '/scrub',
+                    data={'image': (io.BytesIO(data), 'empty.jpg')},
+                    content_type='multipart/form-data'
+                )
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.get_json().get('category'), 'input_error')
+
+    def test_scrub_reports_full_temp_storage(self):
+        full = OSError(errno.ENOSPC, 'No space left on device')
+        with mock.patch.object(FileStorage, 'save', side_effect=full):
+            response = self.client.post(
+                '/scrub',
+                data={'image': (build_image_bytes('JPEG'), 'photo.jpg')},
+                content_type='multipart/form-data'
+            )
+        self.assertEqual(response.status_code, 507)
+        self.assertEqual(response.get_json().get('category'), 'output_error')
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,148 @@
+import io
+import unittest
+
+from PIL import Image
+from PIL.PngImagePlugin import PngInfo
+
+from fast_strip import read_orientation, strip_jpeg, strip_png, strip_webp
+
+
+def build_jpeg_with_metadata():
+    image = Image.new('RGB', (16, 16), color='navy')
+    exif = Image.Exif()
+    exif[0x010F] = 'SecretCam'
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', exif=exif, comment=b'secret comment')
+    return buffer.getvalue()
+
+
+class StripJpegTests(unittest.TestCase):
+    def test_removes_exif_and_comment_losslessly(self):
+        data = build_jpeg_with_metadata()
+        stripped = strip_jpeg(data)
+
+        self.assertNotIn(b'SecretCam', stripped)
+        self.assertNotIn(b'secret comment', stripped)
+        with Image.open(io.BytesIO(data)) as original, Image.open(io.BytesIO(stripped)) as clean:
+            self.assertNotIn('exif', clean.info)
+            self.assertEqual(original.tobytes(), clean.tobytes())
+
+    def test_drops_exif_bearing_image_appended_after_eoi(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (16, 16), color='navy').save(buffer, format='JPEG')
+        primary = buffer.getvalue()
+        data = primary + build_jpeg_with_metadata()
+
+        stripped = strip_jpeg(data)
+
+        self.assertNotIn(b'SecretCam', stripped)
+        self.assertEqual(stripped, primary)
+
+    def test_drops_comment_between_progressive_scans(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (16, 16), color='navy').save(buffer, format='JPEG', progressive=True)
+        data = buffer.getvalue()
+        second_scan = data.index(b'\xff\xda', data.index(b'\xff\xda') + 2)
+        injected = data[:second_scan] + b'\xff\xfe\x00\x08secret' + data[second_scan:]
+
+        self.assertEqual(strip_jpeg(injected), data)
+
+    def test_returns_input_unchanged_without_metadata(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (16, 16), color='navy').save(buffer, format='JPEG')
+        data = buffer.getvalue()
+        self.assertIs(strip_jpeg(data), data)
+
+    def test_rejects_non_jpeg(self):
+        with self.assertRaises(ValueError):
+            strip_jpeg(b'\x89PNG\r\n\x1a\n')
+
+
+class StripPngTests(unittest.TestCase):
+    def test_removes_text_and_time_chunks_and_keeps_pixels(self):
+        image = Image.new('RGBA', (16, 16), color=(0, 0, 128, 100))
+        info = PngInfo()
+        info.add_text('Author', 'secret author')
+        info.add(b'tIME', b'\x07\xea\x0a\x0f\x0c\x00\x00')
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG', pnginfo=info)
+        stripped = strip_png(buffer.getvalue())
+
+        self.assertNotIn(b'secret author', stripped)
+        self.assertNotIn(b'tIME', stripped)
+        with Image.open(io.BytesIO(stripped)) as clean:
+            self.assertEqual(clean.tobytes(), image.tobytes())
+
+    def test_drops_trailer_after_iend(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (16, 16), color='navy').save(buffer, format='PNG')
+        data = buffer.getvalue()
+
+        self.assertEqual(strip_png(data + b'GPS:51.5,-0.1'), data)
+
+
+class StripWebpTests(unittest.TestCase):
+    def test_removes_exif_and_xmp_chunks(self):
+        exif = Image.Exif()
+        exif[0x010F] = 'SecretCam'
+        buffer = io.BytesIO()
+        Image.new('RGB', (16, 16), color='navy').save(
+            buffer, format='WEBP', exif=exif, xmp=b'<x>secret xmp</x>'
+        )
+        stripped = strip_webp(buffer.getvalue())
+
+        self.assertNotIn(b'SecretCam', stripped)
+        self.assertNotIn(b'secret xmp', stripped)
+        with Image.open(io.BytesIO(stripped)) as clean:
+            clean.load()
+            self.assertNotIn('exif', clean.info)
+            self.assertNotIn('xmp', clean.info)
+
+    def test_drops_trailer_past_riff_size(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (16, 16), color='navy').save(buffer, format='WEBP')
+        data = buffer.getvalue()
+
+        self.assertEqual(strip_webp(data + b'GPS:51.5,-0.1'), data)
+
+
+class StructureCheckTests(unittest.TestCase):
+    def test_rejects_containers_without_image_data(self):
+        cases = [
+            (strip_jpeg, b'\xff\xd8\xff\xd9'),
+            (strip_jpeg, b'\xff\xd8\xff\xda\x00\x02garbage'),
+            (strip_png, b'\x89PNG\r\n\x1a\n\x00\x00\x00\x00IEND\xaeB`\x82'),
+            (strip_webp, b'RIFF\x0c\x00\x00\x00WEBPJUNK\x00\x00\x00\x00'),
+        ]
+        for strip, data in cases:
+            with self.subTest(data=data):
+                with self.assertRaises(ValueError):
+                    strip(data)
+
+
+class ReadOrientationTests(unittest.TestCase):
+    def test_reads_orientation_from_exif(self):
+        for fmt in ('JPEG', 'PNG', 'WEBP'):
+            exif = Image.Exif()
+            exif[0x0112] = 6
+            buffer = io.BytesIO()
+            Image.new('RGB', (16, 16), color='navy').save(buffer, format=fmt, exif=exif)
+            with self.subTest(fmt=fmt):
+                self.assertEqual(read_orientation(buffer.getvalue(), fmt), 6)
+
+    def test_treats_invalid_values_as_upright(self):
+        for value in (0, 9):
+            exif = Image.Exif()
+            exif[0x0112] = value
+            buffer = io.BytesIO()
+            Image.new('RGB', (16, 16), color='navy').save(buffer, format='JPEG', exif=exif)
+            with self.subTest(value=value):
+                self.assertEqual(read_orientation(buffer.getvalue(), 'JPEG'), 1)
+
+    def test_defaults_to_upright_without_exif(self):
+        self.assertEqual(read_orientation(build_jpeg_with_metadata(), 'JPEG'), 1)
+        self.assertEqual(read_orientation(b'\xff\xd8\xff', 'JPEG'), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,182 @@
+import importlib.util
+import io
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from PIL import Image
+
+import image_scrubber
+from image_scrubber import ImageScrubber, ResultType
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import mozjpeg_lossless_optimization
+except ImportError:
+    mozjpeg_lossless_optimization = None
+
+
+def build_jpeg(size, exif=None):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color='navy').save(buffer, format='JPEG', exif=exif or b'')
+    return buffer.getvalue()
+
+
+class StubTurboJPEG:
+    """Pillow-backed stand-in for PyTurboJPEG's TurboJPEG."""
+
+    def __init__(self):
+        self.dsts = []
+        self.flags = []
+
+    def decode_header(self, data):
+        with Image.open(io.BytesIO(data)) as img:
+            return img.width, img.height, 2, 1
+
+    def decode(self, data, pixel_format, dst=None):
+        with Image.open(io.BytesIO(data)) as img:
+            pixels = np.asarray(img.convert('RGB'))
+        self.dsts.append(dst)
+        if dst is None:
+            return pixels.copy()
+        dst[...] = pixels
+        return dst
+
+    def encode(self, pixels, quality, pixel_format, jpeg_subsample, flags=0):
+        self.flags.append(flags)
+        buffer = io.BytesIO()
+        Image.fromarray(np.ascontiguousarray(pixels)).save(
+            buffer, format='JPEG', quality=quality, progressive=bool(flags)
+        )
+        return buffer.getvalue()
+
+
+@unittest.skipUnless(np is not None, 'numpy is required for the libjpeg-turbo path')
+class TurboJpegPathTests(unittest.TestCase):
+    def setUp(self):
+        self.tj = StubTurboJPEG()
+        patcher = mock.patch.multiple(
+            image_scrubber,
+            create=True,
+            _tj=self.tj,
+            _tls=threading.local(),
+            np=np,
+            TJPF_RGB=0,
+            TJSAMP_420=2,
+            TJFLAG_PROGRESSIVE=16384,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_decodes_reuse_thread_local_buffer(self):
+        image_scrubber._reencode_jpeg_turbo(build_jpeg((16, 16)), 95)
+        pool = image_scrubber._tls.pixels
+        image_scrubber._reencode_jpeg_turbo(build_jpeg((8, 4)), 95)
+
+        self.assertIs(image_scrubber._tls.pixels, pool)
+        self.assertEqual(self.tj.dsts[1].shape, (4, 8, 3))
+        self.assertTrue(np.shares_memory(self.tj.dsts[1], pool))
+
+        image_scrubber._reencode_jpeg_turbo(build_jpeg((32, 32)), 95)
+        self.assertEqual(image_scrubber._tls.pixels.size, 32 * 32 * 3)
+
+    def test_images_over_pool_limit_get_fresh_array(self):
+        with mock.patch.object(image_scrubber, '_PIXEL_POOL_LIMIT', 100):
+            image_scrubber._reencode_jpeg_turbo(build_jpeg((16, 16)), 95)
+
+        self.assertIsNone(self.tj.dsts[0])
+        self.assertIsNone(getattr(image_scrubber._tls, 'pixels', None))
+
+    def test_optimize_requests_progressive_encode(self):
+        image_scrubber._reencode_jpeg_turbo(build_jpeg((16, 16)), 95)
+        output = image_scrubber._reencode_jpeg_turbo(build_jpeg((16, 16)), 95, optimize=True)
+
+        self.assertEqual(self.tj.flags, [0, 16384])
+        with Image.open(io.BytesIO(output)) as img:
+            self.assertTrue(img.info.get('progressive'))
+
+    def test_scrub_rotates_through_turbo_path(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        with tempfile.TemporaryDirectory() as tmp:
+            input_path = Path(tmp) / 'rotated.jpg'
+            output_path = Path(tmp) / 'out' / 'rotated.jpg'
+            input_path.write_bytes(build_jpeg((16, 8), exif=exif))
+
+            result = ImageScrubber.scrub(input_path, output_path)
+
+            self.assertEqual(result.result_type, ResultType.SUCCESS)
+            self.assertEqual(len(self.tj.flags), 1)
+            with Image.open(output_path) as img:
+                self.assertEqual(img.size, (8, 16))
+                self.assertNotIn('exif', img.info)
+
+
+@unittest.skipUnless(mozjpeg_lossless_optimization is not None, 'mozjpeg-lossless-optimization is required')
+class MozjpegBackendTests(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(image_scrubber, '_mozjpeg', mozjpeg_lossless_optimization)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def scrub(self, data):
+        with tempfile.TemporaryDirectory() as tmp:
+            input_path = Path(tmp) / 'photo.jpg'
+            output_path = Path(tmp) / 'out' / 'photo.jpg'
+            input_path.write_bytes(data)
+
+            result = ImageScrubber.scrub(input_path, output_path)
+
+            self.assertEqual(result.result_type, ResultType.SUCCESS)
+            return output_path.read_bytes()
+
+    def assertCleanProgressiveJpeg(self, output, size):
+        with Image.open(io.BytesIO(output)) as img:
+            img.load()
+            self.assertEqual(img.format, 'JPEG')
+            self.assertEqual(img.size, size)
+            self.assertTrue(img.info.get('progressive'))
+            self.assertNotIn('exif', img.info)
+            self.assertNotIn('comment', img.info)
+
+    def test_stripped_jpeg_is_optimized(self):
+        exif = Image.Exif()
+        exif[0x010F] = 'Camera Maker'
+        self.assertCleanProgressiveJpeg(self.scrub(build_jpeg((16, 8), exif=exif)), (16, 8))
+
+    def test_reencoded_jpeg_is_optimized(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        with mock.patch.object(image_scrubber, '_tj', None):
+            output = self.scrub(build_jpeg((16, 8), exif=exif))
+        self.assertCleanProgressiveJpeg(output, (8, 16))
+
+
+class JpegBackendSettingTests(unittest.TestCase):
+    def load_module(self, backend):
+        # Load a private copy so the shared image_scrubber module is left untouched.
+        spec = importlib.util.spec_from_file_location('_image_scrubber_copy', image_scrubber.__file__)
+        module = importlib.util.module_from_spec(spec)
+        with mock.patch.dict(os.environ, {'JPEG_BACKEND': backend}):
+            spec.loader.exec_module(module)
+        return module
+
+    def test_unknown_backend_is_rejected(self):
+        with self.assertRaisesRegex(ValueError, 'JPEG_BACKEND'):
+            self.load_module('mozjepg')
+
+    def test_backend_name_is_case_insensitive(self):
+        module = self.load_module('TURBO')
+        self.assertEqual(module.JPEG_BACKEND, 'turbo')
+        self.assertIsNone(module._mozjpeg)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,10 @@
 from pathlib import Path
+import errno
+import io
+import os
 import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from flask import Flask, request, send_file, jsonify, after_this_request
 from flask_cors import CORS
 import time
@@ -9,8 +14,60 @@ from image_scrubber import ImageScrubber, ResultType
 app = Flask(__name__)
 CORS(app)
 
-#Max upload size: 200MB
-app.config['MAX_CONTENT_LENGTH'] = 200 * 1024 * 1024
+#Max upload size: 200MB. Keep in sync with nginx client_max_body_size so
+#oversized uploads are rejected before they reach Python (see README).
+MAX_UPLOAD_MB = 200
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_MB * 1024 * 1024
+
+# CPU-bound scrubbing runs here. Request threads block on the result, so the
+# pool caps how many scrubs run at once in this process. It defaults to one
+# per core; with several gunicorn workers set SCRUBBER_THREADS to
+# cores // workers so the processes together don't oversubscribe the CPU.
+SCRUBBER_THREADS = int(os.environ.get('SCRUBBER_THREADS') or os.cpu_count() or 4)
+executor = ThreadPoolExecutor(max_workers=SCRUBBER_THREADS)
+
+# Per-request temp files go to the system temp dir unless SCRUBBER_TMP_DIR
+# points elsewhere, e.g. /dev/shm to keep them off the block device. tmpfs is
+# opt-in because it must fit inputs plus outputs (see README).
+TMP_ROOT = os.environ.get('SCRUBBER_TMP_DIR') or None
+
+
+def make_request_tmpdir() -> Path:
+    """Create a temp dir that is removed once the response has been built."""
+    tmpdir = Path(tempfile.mkdtemp(prefix="metadata_scrubber_", dir=TMP_ROOT))
+
+    @after_this_request
+    def cleanup_temp_dir(response):
+        for _ in range(3):
+            try:
+                for file_path in tmpdir.glob('*'):
+                    file_path.unlink(missing_ok=True)
+                tmpdir.rmdir()
+                break
+            except OSError:
+                time.sleep(0.05)
+        return response
+
+    return tmpdir
+
+
+def save_upload(file, path: Path) -> bool:
+    """Save an upload to ``path``; False if the temp filesystem is full."""
+    try:
+        file.save(path)
+    except OSError as e:
+        if e.errno != errno.ENOSPC:
+            raise
+        return False
+    return True
+
+
+def storage_full_response():
+    return jsonify({
+        "error": "Not enough temporary storage for this upload",
+        "category": "output_error",
+        "hint": "Retry later, or give SCRUBBER_TMP_DIR more space"
+    }), 507
 
 
 @app.route('/')
@@ -20,7 +77,7 @@ def home():
         'status': 'running',
         'service': 'Metadata Scrubber API',
         'version': '2.1',
-        'endpoints': ['/scrub', '/health', '/formats'],
+        'endpoints': ['/scrub', '/scrub_batch', '/health', '/formats'],
         'supported_formats': list(ImageScrubber.SUPPORTED_FORMATS)
     })
 
@@ -52,19 +109,7 @@ def scrub():
         }), 400
 
     # ---- temp filesystem boundary ----
-    tmpdir = Path(tempfile.mkdtemp(prefix="metadata_scrubber_"))
-
-    @after_this_request
-    def cleanup_temp_dir(response):
-        for _ in range(3):
-            try:
-                for file_path in tmpdir.glob('*'):
-                    file_path.unlink(missing_ok=True)
-                tmpdir.rmdir()
-                break
-            except OSError:
-                time.sleep(0.05)
-        return response
+    tmpdir = make_request_tmpdir()
 
     safe_name = secure_filename(file.filename)
     if not safe_name:
@@ -78,10 +123,13 @@ def scrub():
     output_path = tmpdir / f"scrubbed_{safe_name}"
 
     # Save uploaded file
-    file.save(input_path)
+    if not save_upload(file, input_path):
+        return storage_full_response()
 
     # ---- call CORE logic ----
-    result = ImageScrubber.scrub(input_path, output_path)
+    # Extra entropy-coding passes are opt-in: ?optimize=1
+    optimize = request.args.get('optimize') == '1'
+    result = executor.submit(ImageScrubber.scrub, input_path, output_path, optimize).result()
 
     if result.result_type == ResultType.ERROR:
         return jsonify({
@@ -105,12 +153,99 @@ def scrub():
     return response
 
 
+@app.route('/scrub_batch', methods=['POST'])
+def scrub_batch():
+    start_time = time.time()
+
+    # ---- basic request validation ----
+    files = request.files.getlist('image')
+    if not files:
+        return jsonify({
+            "error": "No image provided",
+            "category": "input_error",
+            "hint": "Send multipart/form-data with one or more 'image' parts"
+        }), 400
+
+    jobs = []
+    for index, file in enumerate(files):
+        safe_name = secure_filename(file.filename or '')
+        if not safe_name:
+            return jsonify({
+                "error": "Invalid filename",
+                "category": "input_error",
+                "hint": "Use standard image filenames"
+            }), 400
+        jobs.append((index, safe_name, file))
+
+    # ---- temp filesystem boundary ----
+    tmpdir = make_request_tmpdir()
+
+    # Save every upload before scrubbing starts, so a full temp filesystem
+    # fails the request without leaving jobs running on the executor.
+    paths = []
+    for index, safe_name, file in jobs:
+        # Index prefix keeps same-named uploads apart on disk.
+        input_path = tmpdir / f"{index}_{safe_name}"
+        if not save_upload(file, input_path):
+            return storage_full_response()
+        paths.append((input_path, tmpdir / f"scrubbed_{index}_{safe_name}"))
+
+    optimize = request.args.get('optimize') == '1'
+    futures = [
+        executor.submit(ImageScrubber.scrub, input_path, output_path, optimize)
+        for input_path, output_path in paths
+    ]
+
+    # ---- call CORE logic in parallel, collect in upload order ----
+    results = [future.result() for future in futures]
+
+    for (_, _, file), result in zip(jobs, results):
+        if result.result_type == ResultType.ERROR:
+            return jsonify({
+                "error": result.error,
+                "category": result.error_category.value,
+                "hint": result.fix_hint,
+                "file": file.filename
+            }), 400
+
+    # Images are already compressed, so store them without deflate.
+    archive = io.BytesIO()
+    used_names = set()
+    with zipfile.ZipFile(archive, 'w', zipfile.ZIP_STORED) as zf:
+        for (_, safe_name, _), result in zip(jobs, results):
+            stem, suffix = os.path.splitext(f"scrubbed_{safe_name}")
+            arcname = f"{stem}{suffix}"
+            counter = 1
+            # Same-named uploads would otherwise overwrite each other on extract.
+            while arcname in used_names:
+                arcname = f"{stem}_{counter}{suffix}"
+                counter += 1
+            used_names.add(arcname)
+            zf.write(result.output_path, arcname)
+    archive.seek(0)
+
+    processing_time = time.time() - start_time
+
+    # ---- success response ----
+    response = send_file(
+        archive,
+        mimetype='application/zip',
+        as_attachment=True,
+        download_name='scrubbed_images.zip'
+    )
+
+    response.headers['X-Processing-Time'] = f"{processing_time:.3f}"
+    response.headers['X-Files-Scrubbed'] = str(len(results))
+
+    return response
+
+
 @app.errorhandler(413)
 def file_too_large(_):
     return jsonify({
         "error": "File too large",
         "category": "input_error",
-        "hint": "Maximum file size is 200MB"
+        "hint": f"Maximum file size is {MAX_UPLOAD_MB}MB"
     }), 413
 
 